@@ -1,87 +1,429 @@
 import asyncio
+import binascii
+import functools
 import logging
+import multiprocessing
 import os
+import re
+import threading
 import hashlib
-import aiofiles
+import itertools
+import numpy as np
+from numpy.dtypes import StringDType
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.sharedctypes import Synchronized
 from tqdm import tqdm
 import argparse
-from typing import Dict, Tuple, Set, List
+from typing import Dict, Iterator, Tuple, Set, List
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 logger = logging.getLogger(__name__)
 
-async def md5sum_async(file_path: str) -> str:
-    hash_md5 = hashlib.md5()
-    async with aiofiles.open(file_path, 'rb') as f:
+# hashlib's MD5 comes from OpenSSL, which picks the fastest implementation for
+# this CPU when it loads. The checksums are not used for security, so say so
+# up front; otherwise FIPS-mode OpenSSL builds refuse to create MD5 objects.
+new_md5 = functools.partial(hashlib.md5, usedforsecurity=False)
+
+HASH_ALGORITHMS = {'md5': new_md5}
+if blake3 is not None:
+    HASH_ALGORITHMS['blake3'] = blake3.blake3
+if xxhash is not None:
+    HASH_ALGORITHMS['xxh128'] = xxhash.xxh128
+DEFAULT_ALGORITHM = 'md5'
+HEADER_PREFIX = '# hash: '
+SORTED_HEADER = '# sorted-v1'
+HEADER_PATTERN = re.compile(rb'# hash: (\w+)')
+
+CHUNK_SIZE = 1 << 20
+BATCH_SIZE = 64
+BATCHES_PER_WORKER = 4
+PROCESS_POOL_MIN_CPUS = 16
+THREAD_SIBLINGS_PATH = '/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list'
+WRITE_BUFFER_SIZE = 8 << 20
+CACHE_SUFFIX = '.cache'
+CACHE_DIRECTORY_PREFIX = '# directory: '
+
+_thread_state = threading.local()
+
+def _read_buffer() -> Tuple[bytearray, memoryview]:
+    # One buffer per worker thread, allocated on first use, so small files do
+    # not each pay for allocating and zeroing a full chunk.
+    if not hasattr(_thread_state, 'buffer'):
+        _thread_state.buffer = bytearray(CHUNK_SIZE)
+        _thread_state.view = memoryview(_thread_state.buffer)
+    return _thread_state.buffer, _thread_state.view
+
+def hash_file(file_path: str, algorithm: str = DEFAULT_ALGORITHM) -> bytes:
+    hasher = HASH_ALGORITHMS[algorithm]()
+    with open(file_path, 'rb', buffering=0) as f:
+        # Files are read rather than memory-mapped: a file truncated by another
+        # process while mapped raises SIGBUS and kills the whole run, whereas
+        # read() just returns short. Sequential advice doubles the kernel's
+        # readahead window so the next chunk is usually already being read
+        # while the current one is hashed.
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        buffer, view = _read_buffer()
         while True:
-            chunk = await f.read(4096)
-            if not chunk:
+            n = f.readinto(buffer)
+            if not n:
                 break
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+            hasher.update(view[:n])
+    return hasher.digest()
 
-async def process_file(file_path: str) -> Tuple[str, str | None]:
+def md5sum(file_path: str) -> str:
+    return hash_file(file_path, 'md5').hex()
+
+def process_file(file_path: str, algorithm: str = DEFAULT_ALGORITHM) -> Tuple[str, bytes | None]:
     try:
-        checksum = await md5sum_async(file_path)
-        return file_path, checksum
+        digest = hash_file(file_path, algorithm)
+        return file_path, digest
     except Exception as e:
         logger.exception(f"Error processing file {file_path}", exc_info=e)
         return file_path, None
 
-async def generate_manifest(directory: str, output_file: str) -> None:
-    with ThreadPoolExecutor() as executor:
-        loop = asyncio.get_event_loop()
-        tasks = []
+def process_files(file_paths: List[str], algorithm: str = DEFAULT_ALGORITHM) -> List[Tuple[str, bytes | None]]:
+    return [process_file(file_path, algorithm) for file_path in file_paths]
+
+def physical_cores() -> List[int]:
+    cpus = sorted(os.sched_getaffinity(0))
+    cores = []
+    for cpu in cpus:
+        # Keep only the first hardware thread of each core; MD5 is pure integer
+        # work and gains nothing from sharing a core with an SMT sibling.
+        try:
+            with open(THREAD_SIBLINGS_PATH.format(cpu=cpu)) as f:
+                first_sibling = int(re.split(r'[,-]', f.read().strip())[0])
+        except (OSError, ValueError):
+            first_sibling = cpu
+        if first_sibling == cpu:
+            cores.append(cpu)
+    return cores or cpus
+
+def pin_worker(counter: Synchronized, cores: List[int]) -> None:
+    with counter.get_lock():
+        worker_id = counter.value
+        counter.value += 1
+    os.sched_setaffinity(0, {cores[worker_id % len(cores)]})
+
+def make_executor(max_workers: int | None) -> Tuple[Executor, int]:
+    if (os.cpu_count() or 1) > PROCESS_POOL_MIN_CPUS and hasattr(os, 'sched_setaffinity'):
+        # On large machines, threads spend a growing share of their time
+        # waiting for the GIL between hashlib calls. Separate processes, one
+        # pinned to each physical core, avoid that. Asking for more workers
+        # than cores only pays off when waiting on slow storage, so threads
+        # remain the better fit there.
+        cores = physical_cores()
+        workers = max_workers or len(cores)
+        if workers <= len(cores):
+            # Workers start lazily, once tqdm's monitor thread is running, and
+            # forking a multi-threaded process can deadlock the child.
+            context = multiprocessing.get_context('forkserver')
+            return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=pin_worker, initargs=(context.Value('i', 0), cores)), workers
+    else:
+        workers = max_workers or os.cpu_count() or 1
+    return ThreadPoolExecutor(max_workers=workers), workers
+
+def walk_files(directory: str) -> Iterator[os.DirEntry]:
+    pending = [directory]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except OSError as e:
+            logger.warning(f"Unable to scan directory: {e}")
+
+def header_line(algorithm: str) -> bytes:
+    return f"{HEADER_PREFIX}{algorithm}\n".encode()
+
+def _parse_header(first_lines: List[bytes]) -> Tuple[str, bool, int]:
+    # Only the exact lines generate_manifest writes, at their fixed positions,
+    # count as the header: line 1 names the algorithm and line 2 may mark the
+    # manifest sorted. Anything else is a record, even if it looks similar.
+    match = HEADER_PATTERN.fullmatch(first_lines[0]) if first_lines else None
+    if match is None:
+        # Manifests written before the header existed are MD5 and unsorted.
+        return 'md5', False, 0
+    if len(first_lines) > 1 and first_lines[1] == SORTED_HEADER.encode():
+        return match.group(1).decode(), True, 2
+    return match.group(1).decode(), False, 1
+
+def read_header(manifest_file: str) -> Tuple[str, bool]:
+    with open(manifest_file, 'rb') as f:
+        first_lines = [f.readline().rstrip(b'\n') for _ in range(2)]
+    algorithm, is_sorted, _ = _parse_header(first_lines)
+    return algorithm, is_sorted
+
+def _cache_header(directory: str, algorithm: str) -> bytes:
+    return header_line(algorithm) + CACHE_DIRECTORY_PREFIX.encode() + os.fsencode(os.path.abspath(directory)) + b'\n'
+
+def load_cache(cache_file: str, directory: str, algorithm: str = DEFAULT_ALGORITHM) -> Dict[str, Tuple[Tuple[int, int, int], bytes]]:
+    cache = {}
+    header = _cache_header(directory, algorithm)
+    try:
+        with open(cache_file, 'rb') as f:
+            # A cache built for another directory or algorithm is useless.
+            if f.read(len(header)) != header:
+                return cache
+            for line in f:
+                size, mtime_ns, ctime_ns, checksum, relative_path = line.rstrip(b'\n').split(b' ', 4)
+                cache[os.fsdecode(relative_path)] = ((int(size), int(mtime_ns), int(ctime_ns)), checksum)
+    except FileNotFoundError:
+        pass
+    except ValueError:
+        logger.warning(f"Ignoring malformed cache file {cache_file}")
+        return {}
+    return cache
+
+def save_cache(cache_file: str, cache: Dict[str, Tuple[Tuple[int, int, int], bytes]], directory: str, algorithm: str = DEFAULT_ALGORITHM) -> None:
+    # Write beside the real file and rename over it, so an interrupted run
+    # never leaves a half-written cache behind.
+    temporary_file = cache_file + '.tmp'
+    with open(temporary_file, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(_cache_header(directory, algorithm))
+        for relative_path, ((size, mtime_ns, ctime_ns), checksum) in cache.items():
+            f.write(b'%d %d %d %s %s\n' % (size, mtime_ns, ctime_ns, checksum, os.fsencode(relative_path)))
+    os.replace(temporary_file, cache_file)
+
+async def generate_manifest(directory: str, output_file: str, max_workers: int | None = None, use_cache: bool = False, algorithm: str = DEFAULT_ALGORITHM) -> None:
+    cache_file = output_file + CACHE_SUFFIX
+    previous_cache = load_cache(cache_file, directory, algorithm) if use_cache else {}
+    cache: Dict[str, Tuple[Tuple[int, int, int], bytes]] = {}
+    executor, workers = make_executor(max_workers)
+    max_in_flight = workers * BATCHES_PER_WORKER
+    with executor:
+        loop = asyncio.get_running_loop()
         logger.info(f"Walking directory {directory} to gather all file paths.")
-        for root, _, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                tasks.append(loop.run_in_executor(executor, process_file, file_path))
-
-        with open(output_file, 'w') as f:
-            for task in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Computing md5sums", unit="file"):
-                result = await task
-                file_path, checksum = await result
-                relative_path = os.path.relpath(file_path, directory)
-                f.write(f"{relative_path} {checksum}\n")
+        # Every walked path starts with the directory prefix, so slicing it off
+        # is equivalent to (and much cheaper than) os.path.relpath.
+        prefix_length = len(os.path.join(directory, ''))
+        fingerprints = {}
+        cached_records: List[Tuple[bytes, bytes]] = []
+        files = []
+        for entry in walk_files(directory):
+            relative_path = entry.path[prefix_length:]
+            if use_cache:
+                # Files whose size and timestamps are unchanged since the last
+                # run reuse the previous checksum without being opened.
+                stat = entry.stat(follow_symlinks=False)
+                fingerprints[relative_path] = (stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+                cached = previous_cache.get(relative_path)
+                if cached is not None and cached[0] == fingerprints[relative_path]:
+                    cache[relative_path] = cached
+                    cached_records.append((os.fsencode(relative_path), cached[1]))
+                    continue
+            files.append((entry.inode(), entry.path))
+        # Inode order approximates on-disk layout on ext4/xfs, so consecutive
+        # reads stay close together on rotating disks.
+        files.sort()
+        file_paths = [file_path for _, file_path in files]
+        logger.info(f"Reusing {len(cached_records)} cached checksums; hashing {len(file_paths)} files.")
+        total = len(cached_records) + len(file_paths)
+        records = cached_records
+        with tqdm(total=total, initial=len(cached_records), desc=f"Computing {algorithm} checksums", unit="file", mininterval=0.5, smoothing=0) as progress:
+            def record(done: Set[asyncio.Future]) -> None:
+                for task in done:
+                    results = task.result()
+                    for file_path, digest in results:
+                        relative_path = file_path[prefix_length:]
+                        checksum = binascii.hexlify(digest) if digest is not None else b'None'
+                        records.append((os.fsencode(relative_path), checksum))
+                        if use_cache and digest is not None:
+                            cache[relative_path] = (fingerprints[relative_path], checksum)
+                    progress.update(len(results))
+
+            # Hand files to the pool in batches so that dispatch overhead is
+            # paid once per batch rather than once per (typically small) file,
+            # and keep only a few batches per worker in flight.
+            pending: Set[asyncio.Future] = set()
+            for i in range(0, len(file_paths), BATCH_SIZE):
+                if len(pending) >= max_in_flight:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    record(done)
+                pending.add(loop.run_in_executor(executor, process_files, file_paths[i:i + BATCH_SIZE], algorithm))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                record(done)
+
+    # Sorting by path lets compare() merge two manifests in a single streaming
+    # pass instead of loading both into memory.
+    records.sort()
+    with open(output_file, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(header_line(algorithm) + SORTED_HEADER.encode() + b'\n')
+        f.writelines(relative_path + b' ' + checksum + b'\n' for relative_path, checksum in records)
+    if use_cache:
+        save_cache(cache_file, cache, directory, algorithm)
     logger.info("Finished generating md5sum manifest file.")
 
+def _read_lines(manifest_file: str) -> Tuple[np.ndarray, np.ndarray]:
+    # Paths are written with os.fsencode, so decode the same way to round-trip
+    # names that are not valid in the filesystem encoding.
+    with open(manifest_file, 'rb') as f:
+        lines = os.fsdecode(f.read()).split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    _, _, header_length = _parse_header([os.fsencode(line) for line in lines[:2]])
+    del lines[:header_length]
+    if not lines:
+        return np.array([], dtype=StringDType()), np.array([], dtype=StringDType())
+    # StringDType keeps each string at its own length; a fixed-width '<U'
+    # array would pad every row to the longest path in the manifest.
+    try:
+        lines = np.array(lines, dtype=StringDType())
+    except UnicodeEncodeError:
+        # StringDType stores UTF-8, which cannot hold the surrogate escapes
+        # that stand in for undecodable file names; keep Python strings.
+        split = [line.rpartition(' ') for line in lines]
+        return np.array([path for path, _, _ in split], dtype=object), np.array([checksum for _, _, checksum in split], dtype=StringDType())
+    # Split on the last space so that paths containing spaces survive.
+    relative_paths, _, checksums = np.strings.rpartition(lines, np.array(' ', dtype=StringDType()))
+    return relative_paths, checksums
+
+def _decode_checksums(checksums: np.ndarray) -> np.ndarray:
+    # Raw digests are a fraction of the size of the hex text and compare as
+    # fixed-width integer rows. Manifests with unparseable entries (e.g. a
+    # file that could not be read) keep the hex text as fixed-width bytes.
+    lengths = np.strings.str_len(checksums)
+    if len(checksums) and np.all(lengths == lengths[0]) and lengths[0] % 2 == 0:
+        try:
+            raw = np.frombuffer(bytes.fromhex(''.join(checksums.tolist())), dtype=np.uint8)
+        except ValueError:
+            pass
+        else:
+            digests = raw.reshape(len(checksums), -1)
+            return digests.view(np.uint64) if digests.shape[1] % 8 == 0 else digests
+    return checksums
+
+def _encode_checksums(digests: np.ndarray) -> np.ndarray:
+    if digests.ndim == 1:
+        return digests.astype(StringDType())
+    width = digests.shape[1] * digests.itemsize
+    return np.frombuffer(binascii.hexlify(digests.tobytes()), dtype=f'S{2 * width}').astype(StringDType())
+
+def read_manifest(manifest_file: str) -> Tuple[np.ndarray, np.ndarray]:
+    relative_paths, checksums = _read_lines(manifest_file)
+    return relative_paths, _decode_checksums(checksums)
+
 def load_manifest(manifest_file: str) -> Dict[str, str]:
-    manifest = {}
-    with open(manifest_file, 'r') as f:
-        for line in f:
-            relative_path, checksum = line.strip().split(' ', 1)
-            manifest[relative_path] = checksum
-    return manifest
+    relative_paths, checksums = _read_lines(manifest_file)
+    return dict(zip(relative_paths.tolist(), checksums.tolist()))
+
+def _checksums_differ(source_digests: np.ndarray, destination_digests: np.ndarray) -> np.ndarray:
+    if source_digests.ndim == 2 and source_digests.shape == destination_digests.shape:
+        return (source_digests != destination_digests).any(axis=1)
+    return _encode_checksums(source_digests) != _encode_checksums(destination_digests)
+
+def _lookup(sorted_paths: np.ndarray, paths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if len(sorted_paths) == 0:
+        return np.zeros(len(paths), dtype=bool), np.zeros(len(paths), dtype=np.intp)
+    positions = np.minimum(np.searchsorted(sorted_paths, paths), len(sorted_paths) - 1)
+    return sorted_paths[positions] == paths, positions
+
+def _sort_by_path(paths: np.ndarray, checksums: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if np.all(paths[:-1] <= paths[1:]):
+        return paths, checksums
+    order = np.argsort(paths)
+    return paths[order], checksums[order]
+
+def compare_manifests(source_manifest: Tuple[np.ndarray, np.ndarray], destination_manifest: Tuple[np.ndarray, np.ndarray]) -> Tuple[Set[str], Set[str], Set[str]]:
+    source_paths, source_checksums = source_manifest
+    destination_paths, destination_checksums = destination_manifest
+    if source_paths.dtype != destination_paths.dtype:
+        source_paths, destination_paths = source_paths.astype(object), destination_paths.astype(object)
+    source_paths, source_checksums = _sort_by_path(source_paths, source_checksums)
+    destination_paths, destination_checksums = _sort_by_path(destination_paths, destination_checksums)
 
-def compare_manifests(source_manifest: Dict[str, str], destination_manifest: Dict[str, str]) -> Tuple[Set[str], Set[str], Set[str]]:
-    source_files = set(source_manifest.keys())
-    destination_files = set(destination_manifest.keys())
+    in_destination, destination_positions = _lookup(destination_paths, source_paths)
+    in_source, _ = _lookup(source_paths, destination_paths)
 
-    missing_files = source_files - destination_files
-    extra_files = destination_files - source_files
-    mismatched_files = {file for file in source_files & destination_files if source_manifest[file] != destination_manifest[file]}
+    missing_files = source_paths[~in_destination]
+    extra_files = destination_paths[~in_source]
+    differs = _checksums_differ(source_checksums[in_destination], destination_checksums[destination_positions[in_destination]])
+    mismatched_files = source_paths[in_destination][differs]
 
+    return set(missing_files.tolist()), set(extra_files.tolist()), set(mismatched_files.tolist())
+
+def _sorted_records(manifest_file: str) -> Iterator[Tuple[bytes, bytes]]:
+    with open(manifest_file, 'rb') as f:
+        first_lines = [line for line in (f.readline(), f.readline()) if line]
+        _, _, header_length = _parse_header([line.rstrip(b'\n') for line in first_lines])
+        previous = None
+        for line in itertools.chain(first_lines[header_length:], f):
+            relative_path, _, checksum = line.rstrip(b'\n').rpartition(b' ')
+            if previous is not None and relative_path <= previous:
+                raise ValueError(f"Manifest {manifest_file} is marked sorted but {relative_path!r} follows {previous!r}")
+            previous = relative_path
+            yield relative_path, checksum
+
+def compare_sorted_manifests(source_manifest_file: str, destination_manifest_file: str) -> Tuple[Set[str], Set[str], Set[str]]:
+    missing_files, extra_files, mismatched_files = set(), set(), set()
+    source_records = _sorted_records(source_manifest_file)
+    destination_records = _sorted_records(destination_manifest_file)
+    source = next(source_records, None)
+    destination = next(destination_records, None)
+    while source is not None and destination is not None:
+        if source[0] < destination[0]:
+            missing_files.add(os.fsdecode(source[0]))
+            source = next(source_records, None)
+        elif source[0] > destination[0]:
+            extra_files.add(os.fsdecode(destination[0]))
+            destination = next(destination_records, None)
+        else:
+            if source[1] != destination[1]:
+                mismatched_files.add(os.fsdecode(source[0]))
+            source = next(source_records, None)
+            destination = next(destination_records, None)
+    while source is not None:
+        missing_files.add(os.fsdecode(source[0]))
+        source = next(source_records, None)
+    while destination is not None:
+        extra_files.add(os.fsdecode(destination[0]))
+        destination = next(destination_records, None)
     return missing_files, extra_files, mismatched_files
 
+def _printable(relative_path: str) -> str:
+    # Undecodable bytes in a file name survive as surrogates, which a strict
+    # UTF-8 stdout refuses; show them as escapes instead.
+    return os.fsencode(relative_path).decode(errors='backslashreplace')
+
 def compare(source_manifest_file: str, destination_manifest_file: str, output_csv: str | None) -> pd.DataFrame:
-    source_manifest = load_manifest(source_manifest_file)
-    destination_manifest = load_manifest(destination_manifest_file)
+    source_algorithm, source_sorted = read_header(source_manifest_file)
+    destination_algorithm, destination_sorted = read_header(destination_manifest_file)
+    if source_algorithm != destination_algorithm:
+        raise ValueError(f"Cannot compare a {source_algorithm} manifest with a {destination_algorithm} manifest")
 
-    missing_files, extra_files, mismatched_files = compare_manifests(source_manifest, destination_manifest)
+    if source_sorted and destination_sorted:
+        missing_files, extra_files, mismatched_files = compare_sorted_manifests(source_manifest_file, destination_manifest_file)
+    else:
+        source_manifest = read_manifest(source_manifest_file)
+        destination_manifest = read_manifest(destination_manifest_file)
+        missing_files, extra_files, mismatched_files = compare_manifests(source_manifest, destination_manifest)
 
     print(f"Files only in source: {len(missing_files)}")
     for file in missing_files:
-        print(file)
+        print(_printable(file))
 
     print(f"Files only in destination: {len(extra_files)}")
     for file in extra_files:
-        print(file)
+        print(_printable(file))
 
-    print(f"Files with different md5sum values: {len(mismatched_files)}")
+    print(f"Files with different {source_algorithm} values: {len(mismatched_files)}")
     for file in mismatched_files:
-        print(file)
+        print(_printable(file))
 
     data = {
         "missing": list(missing_files),
@@ -90,7 +432,7 @@ def compare(source_manifest_file: str, destination_manifest_file: str, output_cs
     }
     df = pd.DataFrame(dict([(k, pd.Series(v)) for k, v in data.items()]))
     if output_csv:
-        df.to_csv(output_csv, index=False)
+        df.to_csv(output_csv, index=False, errors='surrogateescape')
         print(f"Results written to {output_csv}")
 
     return df
@@ -102,6 +444,9 @@ def main() -> None:
     generate_parser = subparsers.add_parser("generate", help="Generate an md5sum manifest for a directory")
     generate_parser.add_argument("directory", type=str, help="Directory to scan")
     generate_parser.add_argument("output_file", type=str, help="Output file to store the manifest")
+    generate_parser.add_argument("--max_workers", type=int, help="Number of files to hash concurrently (default: number of CPUs, or physical cores on machines with more than 16 CPUs; raise it for high-latency storage)", default=None)
+    generate_parser.add_argument("--hash", type=str, choices=sorted(HASH_ALGORITHMS), help=f"Checksum algorithm (default: {DEFAULT_ALGORITHM}); blake3 and xxh128 need the blake3 and xxhash packages", default=DEFAULT_ALGORITHM)
+    generate_parser.add_argument("--cache", action="store_true", help="Reuse checksums from the previous run for files whose size and timestamps are unchanged; faster, but cannot detect corruption that leaves them untouched")
 
     compare_parser = subparsers.add_parser("compare", help="Compare two md5sum manifests")
     compare_parser.add_argument("source_manifest", type=str, help="Source manifest file")
@@ -111,7 +456,7 @@ def main() -> None:
     args = parser.parse_args()
 
     if args.command == "generate":
-        asyncio.run(generate_manifest(args.directory, args.output_file))
+        asyncio.run(generate_manifest(args.directory, args.output_file, args.max_workers, args.cache, args.hash))
     elif args.command == "compare":
         compare(args.source_manifest, args.destination_manifest, args.output_csv)
     else:
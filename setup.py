@@ -11,10 +11,14 @@ setup(
     url="https://github.com/peterjdolan/md5sum_compare",
     packages=find_packages(),
     install_requires=[
-        "aiofiles",
+        "numpy>=2.1",
         "pandas",
         "tqdm",
     ],
+    extras_require={
+        "blake3": ["blake3"],
+        "xxhash": ["xxhash"],
+    },
     entry_points={
         "console_scripts": [
             "md5sum_compare=md5sum_compare.main:main",
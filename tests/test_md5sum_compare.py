@@ -1,14 +1,30 @@
 import pytest
+import hashlib
 import os
 import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from md5sum_compare.main import (
-    md5sum_async,
+    CHUNK_SIZE,
+    PROCESS_POOL_MIN_CPUS,
+    physical_cores,
+    pin_worker,
+    make_executor,
+    md5sum,
     process_file,
+    process_files,
+    walk_files,
+    load_cache,
+    save_cache,
     generate_manifest,
+    read_manifest,
     load_manifest,
     compare_manifests,
+    compare_sorted_manifests,
+    read_header,
     compare
 )
+import numpy as np
 import pandas as pd
 
 # Utility function to create test files with specific content
@@ -18,20 +34,39 @@ def create_test_file(dir_path, filename, content):
         f.write(content)
     return file_path
 
-@pytest.mark.asyncio
-async def test_md5sum_async():
+def test_md5sum():
     with tempfile.TemporaryDirectory() as tmpdirname:
         file_path = create_test_file(tmpdirname, "test.txt", "Hello, World!")
-        checksum = await md5sum_async(file_path)
-        assert checksum == "65a8e27d8879283831b664bd8b7f0ad4"
+        assert md5sum(file_path) == "65a8e27d8879283831b664bd8b7f0ad4"
 
-@pytest.mark.asyncio
-async def test_process_file():
+def test_md5sum_multiple_chunks():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        content = "0123456789abcdef" * (CHUNK_SIZE // 16 * 3 + 5)
+        file_path = create_test_file(tmpdirname, "large.txt", content)
+        assert md5sum(file_path) == hashlib.md5(content.encode()).hexdigest()
+
+def test_process_file():
     with tempfile.TemporaryDirectory() as tmpdirname:
         file_path = create_test_file(tmpdirname, "test.txt", "Hello, World!")
-        path, checksum = await process_file(file_path)
+        path, digest = process_file(file_path)
         assert path == file_path
-        assert checksum == "65a8e27d8879283831b664bd8b7f0ad4"
+        assert digest == bytes.fromhex("65a8e27d8879283831b664bd8b7f0ad4")
+
+def test_process_files():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        file_path = create_test_file(tmpdirname, "test.txt", "Hello, World!")
+        missing_path = os.path.join(tmpdirname, "missing.txt")
+        results = process_files([file_path, missing_path])
+        assert results == [(file_path, bytes.fromhex("65a8e27d8879283831b664bd8b7f0ad4")), (missing_path, None)]
+
+def test_walk_files():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        os.makedirs(os.path.join(tmpdirname, "sub", "deeper"))
+        file1_path = create_test_file(tmpdirname, "test1.txt", "Hello, World!")
+        file2_path = create_test_file(os.path.join(tmpdirname, "sub", "deeper"), "test2.txt", "Another file content")
+        os.symlink(file1_path, os.path.join(tmpdirname, "link.txt"))
+        os.symlink(os.path.join(tmpdirname, "sub"), os.path.join(tmpdirname, "linkdir"))
+        assert sorted(entry.path for entry in walk_files(tmpdirname)) == sorted([file1_path, file2_path])
 
 @pytest.mark.asyncio
 async def test_generate_manifest():
@@ -44,9 +79,126 @@ async def test_generate_manifest():
         
         with open(output_file, 'r') as f:
             lines = f.readlines()
-            assert len(lines) == 2
-            assert "test1.txt 65a8e27d8879283831b664bd8b7f0ad4\n" in lines
-            assert "test2.txt f41f69f6f6eb0d631ea0d9a45e2ed04d\n" in lines
+            assert lines == [
+                "# hash: md5\n",
+                "# sorted-v1\n",
+                "test1.txt 65a8e27d8879283831b664bd8b7f0ad4\n",
+                "test2.txt f41f69f6f6eb0d631ea0d9a45e2ed04d\n",
+            ]
+
+@pytest.mark.asyncio
+async def test_generate_manifest_undecodable_file_name():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        file_name = os.fsdecode(b"caf\xe9.txt")
+        create_test_file(tmpdirname, file_name, "Hello, World!")
+
+        output_file = os.path.join(tmpdirname, "manifest.txt")
+        await generate_manifest(tmpdirname, output_file)
+
+        relative_paths, _ = read_manifest(output_file)
+        assert relative_paths.tolist() == [file_name]
+
+        with open(os.path.join(tmpdirname, "other.txt"), 'w') as f:
+            f.write("caf.txt 65a8e27d8879283831b664bd8b7f0ad4\n")
+        missing_files, extra_files, _ = compare_manifests(read_manifest(output_file), read_manifest(os.path.join(tmpdirname, "other.txt")))
+        assert missing_files == {file_name}
+        assert extra_files == {"caf.txt"}
+
+        output_csv = os.path.join(tmpdirname, "results.csv")
+        compare(output_file, os.path.join(tmpdirname, "other.txt"), output_csv)
+        with open(output_csv, 'rb') as f:
+            assert b"caf\xe9.txt" in f.read()
+
+@pytest.mark.asyncio
+async def test_generate_manifest_reuses_cached_checksums():
+    with tempfile.TemporaryDirectory() as tmpdirname, tempfile.TemporaryDirectory() as outdirname:
+        create_test_file(tmpdirname, "test1.txt", "Hello, World!")
+        create_test_file(tmpdirname, "test2.txt", "Another file content")
+
+        output_file = os.path.join(outdirname, "manifest.txt")
+        cache_file = output_file + ".cache"
+        await generate_manifest(tmpdirname, output_file)
+        assert not os.path.exists(cache_file)
+
+        await generate_manifest(tmpdirname, output_file, use_cache=True)
+        cache = load_cache(cache_file, tmpdirname)
+        assert cache["test1.txt"][1] == b"65a8e27d8879283831b664bd8b7f0ad4"
+
+        # A stale checksum is reused while the file's fingerprint is unchanged...
+        cache["test2.txt"] = (cache["test2.txt"][0], b"0" * 32)
+        save_cache(cache_file, cache, tmpdirname)
+        # ...but a modified file is hashed again.
+        create_test_file(tmpdirname, "test1.txt", "Hello, World?")
+        await generate_manifest(tmpdirname, output_file, use_cache=True)
+
+        with open(output_file, 'r') as f:
+            lines = f.readlines()
+            assert len(lines) == 4
+            assert "test1.txt " + hashlib.md5(b"Hello, World?").hexdigest() + "\n" in lines
+            assert "test2.txt " + "0" * 32 + "\n" in lines
+
+def test_load_cache_other_directory():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        cache_file = os.path.join(tmpdirname, "manifest.txt.cache")
+        save_cache(cache_file, {"test1.txt": ((13, 1, 2), b"65a8e27d8879283831b664bd8b7f0ad4")}, os.path.join(tmpdirname, "a"))
+        assert load_cache(cache_file, os.path.join(tmpdirname, "a")) == {"test1.txt": ((13, 1, 2), b"65a8e27d8879283831b664bd8b7f0ad4")}
+        assert load_cache(cache_file, os.path.join(tmpdirname, "b")) == {}
+        assert load_cache(cache_file, os.path.join(tmpdirname, "a"), "xxh128") == {}
+
+def test_load_cache_truncated():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        cache_file = os.path.join(tmpdirname, "manifest.txt.cache")
+        save_cache(cache_file, {"test1.txt": ((13, 1, 2), b"65a8e27d8879283831b664bd8b7f0ad4")}, tmpdirname)
+        with open(cache_file, 'ab') as f:
+            f.write(b"12 34")
+        assert load_cache(cache_file, tmpdirname) == {}
+
+@pytest.mark.asyncio
+async def test_generate_manifest_process_pool(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: PROCESS_POOL_MIN_CPUS * 2)
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        create_test_file(tmpdirname, "test1.txt", "Hello, World!")
+        create_test_file(tmpdirname, "test2.txt", "Another file content")
+
+        output_file = os.path.join(tmpdirname, "manifest.txt")
+        await generate_manifest(tmpdirname, output_file)
+
+        relative_paths, _ = read_manifest(output_file)
+        assert relative_paths.tolist() == ["test1.txt", "test2.txt"]
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="requires sched_setaffinity")
+def test_make_executor(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: PROCESS_POOL_MIN_CPUS * 2)
+    cores = physical_cores()
+    executor, workers = make_executor(None)
+    with executor:
+        assert isinstance(executor, ProcessPoolExecutor)
+        assert workers == len(cores)
+    executor, workers = make_executor(len(cores) + 1)
+    with executor:
+        assert isinstance(executor, ThreadPoolExecutor)
+        assert workers == len(cores) + 1
+
+    monkeypatch.setattr(os, "cpu_count", lambda: PROCESS_POOL_MIN_CPUS)
+    executor, workers = make_executor(None)
+    with executor:
+        assert isinstance(executor, ThreadPoolExecutor)
+        assert workers == PROCESS_POOL_MIN_CPUS
+
+def test_physical_cores(monkeypatch, tmp_path):
+    for cpu, siblings in enumerate(["0,2", "1,3", "0,2", "1,3", "4-5", "4-5"]):
+        (tmp_path / f"cpu{cpu}").write_text(siblings + "\n")
+    monkeypatch.setattr("md5sum_compare.main.THREAD_SIBLINGS_PATH", str(tmp_path / "cpu{cpu}"))
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(6)), raising=False)
+    assert physical_cores() == [0, 1, 4]
+
+def test_pin_worker(monkeypatch):
+    pinned = []
+    monkeypatch.setattr(os, "sched_setaffinity", lambda pid, cpus: pinned.append(cpus), raising=False)
+    counter = multiprocessing.Value("i", 0)
+    for _ in range(3):
+        pin_worker(counter, [0, 2])
+    assert pinned == [{0}, {2}, {0}]
 
 def test_load_manifest():
     manifest_content = """test1.txt 65a8e27d8879283831b664bd8b7f0ad4
@@ -60,19 +212,70 @@ test2.txt a9c91d9759d65b8d3b23ed7efc2b4bbd
         assert manifest["test2.txt"] == "a9c91d9759d65b8d3b23ed7efc2b4bbd"
         os.remove(tmpfile.name)
 
+def test_read_manifest():
+    manifest_content = """test1.txt 65a8e27d8879283831b664bd8b7f0ad4
+dir/with space.txt a9c91d9759d65b8d3b23ed7efc2b4bbd
+"""
+    with tempfile.NamedTemporaryFile(delete=False) as tmpfile:
+        tmpfile.write(manifest_content.encode())
+        tmpfile.close()
+        relative_paths, checksums = read_manifest(tmpfile.name)
+        assert relative_paths.tolist() == ["test1.txt", "dir/with space.txt"]
+        assert checksums.shape == (2, 2)
+        assert checksums.tobytes().hex() == "65a8e27d8879283831b664bd8b7f0ad4a9c91d9759d65b8d3b23ed7efc2b4bbd"
+        os.remove(tmpfile.name)
+
+def test_read_manifest_long_path():
+    long_path = "deep/" * 400 + "file.txt"
+    manifest_content = "".join(f"test{i}.txt 65a8e27d8879283831b664bd8b7f0ad4\n" for i in range(1000))
+    manifest_content += f"{long_path} a9c91d9759d65b8d3b23ed7efc2b4bbd\n"
+    with tempfile.NamedTemporaryFile(delete=False) as tmpfile:
+        tmpfile.write(manifest_content.encode())
+        tmpfile.close()
+        relative_paths, _ = read_manifest(tmpfile.name)
+        assert relative_paths[-1] == long_path
+        # Rows must not be padded to the width of the longest path.
+        assert isinstance(relative_paths.dtype, np.dtypes.StringDType)
+        assert relative_paths.nbytes < len(long_path) * len(relative_paths)
+        os.remove(tmpfile.name)
+
 def test_compare_manifests():
-    source_manifest = {
-        "test1.txt": "65a8e27d8879283831b664bd8b7f0ad4",
-        "test2.txt": "a9c91d9759d65b8d3b23ed7efc2b4bbd"
-    }
-    destination_manifest = {
-        "test1.txt": "65a8e27d8879283831b664bd8b7f0ad4",
-        "test3.txt": "d41d8cd98f00b204e9800998ecf8427e"
-    }
+    source_manifest = (
+        np.array(["test1.txt", "test2.txt", "test4.txt"]),
+        np.array(["65a8e27d8879283831b664bd8b7f0ad4", "a9c91d9759d65b8d3b23ed7efc2b4bbd", "f41f69f6f6eb0d631ea0d9a45e2ed04d"])
+    )
+    destination_manifest = (
+        np.array(["test4.txt", "test3.txt", "test1.txt"]),
+        np.array(["65a8e27d8879283831b664bd8b7f0ad4", "d41d8cd98f00b204e9800998ecf8427e", "65a8e27d8879283831b664bd8b7f0ad4"])
+    )
     missing_files, extra_files, mismatched_files = compare_manifests(source_manifest, destination_manifest)
     
     assert missing_files == {"test2.txt"}
     assert extra_files == {"test3.txt"}
+    assert mismatched_files == {"test4.txt"}
+
+def test_compare_manifests_unreadable_file():
+    source_manifest = (
+        np.array(["test1.txt", "test2.txt"]),
+        np.array([[0x0123456789abcdef, 0], [0xfedcba9876543210, 0]], dtype=np.uint64)
+    )
+    destination_manifest = (
+        np.array(["test1.txt", "test2.txt"]),
+        np.array([b"efcdab89674523010000000000000000", b"None"])
+    )
+    missing_files, extra_files, mismatched_files = compare_manifests(source_manifest, destination_manifest)
+
+    assert missing_files == set()
+    assert extra_files == set()
+    assert mismatched_files == {"test2.txt"}
+
+def test_compare_manifests_empty_destination():
+    source_manifest = (np.array(["test1.txt"]), np.array(["65a8e27d8879283831b664bd8b7f0ad4"]))
+    destination_manifest = (np.array([], dtype=str), np.array([], dtype=str))
+    missing_files, extra_files, mismatched_files = compare_manifests(source_manifest, destination_manifest)
+
+    assert missing_files == {"test1.txt"}
+    assert extra_files == set()
     assert mismatched_files == set()
 
 def test_compare():
@@ -109,5 +312,101 @@ test3.txt d41d8cd98f00b204e9800998ecf8427e
 
         assert os.path.exists(output_csv_path)
 
+def test_compare_sorted_manifests():
+    source_manifest_content = """# hash: md5
+# sorted-v1
+test1.txt 65a8e27d8879283831b664bd8b7f0ad4
+test2.txt a9c91d9759d65b8d3b23ed7efc2b4bbd
+test4.txt f41f69f6f6eb0d631ea0d9a45e2ed04d
+"""
+    destination_manifest_content = """# hash: md5
+# sorted-v1
+test1.txt 65a8e27d8879283831b664bd8b7f0ad4
+test3.txt d41d8cd98f00b204e9800998ecf8427e
+test4.txt 65a8e27d8879283831b664bd8b7f0ad4
+test5.txt d41d8cd98f00b204e9800998ecf8427e
+"""
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        source_manifest_path = os.path.join(tmpdirname, "source_manifest.txt")
+        destination_manifest_path = os.path.join(tmpdirname, "destination_manifest.txt")
+
+        with open(source_manifest_path, 'w') as f:
+            f.write(source_manifest_content)
+
+        with open(destination_manifest_path, 'w') as f:
+            f.write(destination_manifest_content)
+
+        missing_files, extra_files, mismatched_files = compare_sorted_manifests(source_manifest_path, destination_manifest_path)
+
+        assert missing_files == {"test2.txt"}
+        assert extra_files == {"test3.txt", "test5.txt"}
+        assert mismatched_files == {"test4.txt"}
+
+@pytest.mark.asyncio
+async def test_compare_sorted_manifests_header_like_paths():
+    with tempfile.TemporaryDirectory() as tmpdirname, tempfile.TemporaryDirectory() as outdirname:
+        create_test_file(tmpdirname, "# hash: x", "Hello, World!")
+        create_test_file(tmpdirname, "# sorted-v1", "Another file content")
+        create_test_file(tmpdirname, "test3.txt", "Third file")
+
+        source_manifest_path = os.path.join(outdirname, "source_manifest.txt")
+        await generate_manifest(tmpdirname, source_manifest_path)
+        os.remove(os.path.join(tmpdirname, "# hash: x"))
+        os.remove(os.path.join(tmpdirname, "# sorted-v1"))
+        destination_manifest_path = os.path.join(outdirname, "destination_manifest.txt")
+        await generate_manifest(tmpdirname, destination_manifest_path)
+
+        missing_files, extra_files, mismatched_files = compare_sorted_manifests(source_manifest_path, destination_manifest_path)
+        assert missing_files == {"# hash: x", "# sorted-v1"}
+        assert extra_files == set()
+        assert mismatched_files == set()
+
+        relative_paths, _ = read_manifest(source_manifest_path)
+        assert relative_paths.tolist() == ["# hash: x", "# sorted-v1", "test3.txt"]
+
+def test_compare_sorted_manifests_out_of_order():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        manifest_path = os.path.join(tmpdirname, "manifest.txt")
+
+        with open(manifest_path, 'w') as f:
+            f.write("# hash: md5\n# sorted-v1\ntest2.txt a9c91d9759d65b8d3b23ed7efc2b4bbd\ntest1.txt 65a8e27d8879283831b664bd8b7f0ad4\n")
+
+        with pytest.raises(ValueError):
+            compare_sorted_manifests(manifest_path, manifest_path)
+
+@pytest.mark.asyncio
+async def test_read_header_ignores_header_like_paths():
+    with tempfile.TemporaryDirectory() as tmpdirname, tempfile.TemporaryDirectory() as outdirname:
+        create_test_file(tmpdirname, "# hash: x", "Hello, World!")
+        create_test_file(tmpdirname, "test2.txt", "Another file content")
+
+        output_file = os.path.join(outdirname, "manifest.txt")
+        await generate_manifest(tmpdirname, output_file)
+        assert read_header(output_file) == ("md5", True)
+
+        legacy_manifest = os.path.join(outdirname, "legacy.txt")
+        with open(legacy_manifest, 'w') as f:
+            f.write("# hash: x 65a8e27d8879283831b664bd8b7f0ad4\n")
+        assert read_header(legacy_manifest) == ("md5", False)
+
+        df = compare(output_file, legacy_manifest, None)
+        assert df['missing'].dropna().tolist() == ["test2.txt"]
+        assert df['extra'].dropna().empty
+        assert df['hash_mismatch'].dropna().empty
+
+def test_compare_different_algorithms():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        source_manifest_path = os.path.join(tmpdirname, "source_manifest.txt")
+        destination_manifest_path = os.path.join(tmpdirname, "destination_manifest.txt")
+
+        with open(source_manifest_path, 'w') as f:
+            f.write("test1.txt 65a8e27d8879283831b664bd8b7f0ad4\n")
+
+        with open(destination_manifest_path, 'w') as f:
+            f.write("# hash: xxh128\ntest1.txt 531df2844447dd5077db03842cd75395\n")
+
+        with pytest.raises(ValueError):
+            compare(source_manifest_path, destination_manifest_path, None)
+
 if __name__ == "__main__":
     pytest.main()
\ No newline at end of file